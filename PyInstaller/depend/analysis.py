@@ -757,10 +757,18 @@ def metadata_required(self) -> set:
         # metadata.
         out = set()
 
+        # Modules using more than one of the packages below are scanned once
+        # per package. Share each code object's function calls between those
+        # scans. Every code object is kept alive by the graph in the meantime
+        # so they're keyed by id() rather than by hash() which digests each
+        # code object's bytecode, names and constants.
+        function_calls_cache = {}
+
         out |= self._metadata_from(
             "pkg_resources",
             ["get_distribution"],  # Requires metadata for one distribution.
             ["require"],  # Requires metadata for all dependencies.
+            _function_calls_cache=function_calls_cache,
         )
 
         # importlib.metadata is often `import ... as`  aliased to
@@ -771,11 +779,13 @@ def metadata_required(self) -> set:
                 importlib_metadata,
                 ["metadata", "distribution", "version", "files", "requires"],
                 [],
+                _function_calls_cache=function_calls_cache,
             )
 
         return out
 
-    def _metadata_from(self, package, methods=(), recursive_methods=()) -> set:
+    def _metadata_from(self, package, methods=(), recursive_methods=(),
+                       _function_calls_cache=None) -> set:
         """Collect metadata whose requirements are implied by given function
         names.
 
@@ -790,6 +800,10 @@ def _metadata_from(self, package, methods=(), recursive_methods=()) -> set:
             recursive_methods:
                 Like **methods** but also implies that a distribution's
                 dependencies' metadata must be collected too.
+            _function_calls_cache:
+                A ``{id(code): function calls}`` dict to share with other
+                calls to this method made while the same code objects are
+                alive.
         Returns:
             Required metadata in hook data ``(source, dest)`` format as
             returned by :func:`PyInstaller.utils.hooks.copy_metadata()`.
@@ -811,10 +825,30 @@ def _metadata_from(self, package, methods=(), recursive_methods=()) -> set:
         for method in recursive_methods:
             need_metadata.update(bytecode.any_alias(package + "." + method))
 
+        # Any matching function call's name must end with one of these. Code
+        # objects which reference none of them can't contain a match and so
+        # needn't be scanned (although their children still are).
+        final_names = {method.split(".")[-1]
+                       for method in [*methods, *recursive_methods]}
+
+        if _function_calls_cache is None:
+            _function_calls_cache = {}
+
+        def _function_calls(code):
+            if final_names.isdisjoint(code.co_names) \
+                    and final_names.isdisjoint(code.co_varnames):
+                return []
+            calls = _function_calls_cache.get(id(code))
+            if calls is None:
+                calls = bytecode.function_calls(code)
+                _function_calls_cache[id(code)] = calls
+            return calls
+
         out = set()
 
         for (name, code) in self.get_code_using(package).items():
-            for calls in bytecode.recursive_function_calls(code).values():
+            for calls in bytecode.search_recursively(_function_calls,
+                                                     code).values():
                 for (function_name, args) in calls:
                     # Only consider function calls taking one argument.
                     if len(args) != 1:
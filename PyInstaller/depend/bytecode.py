@@ -27,16 +27,21 @@
 from types import CodeType
 
 
-def _instruction_to_regex(x: str):
-    """Get a regex-escaped opcode byte from its human readable name."""
-    if x not in dis.opname:  # pragma: no cover
-        # These opcodes are available only in Python >=3.7.
-        # For our purposes, these aliases will do.
-        if x == "LOAD_METHOD":
-            x = "LOAD_ATTR"
-        elif x == "CALL_METHOD":
-            x = "CALL_FUNCTION"
-    return re.escape(bytes([dis.opmap[x]]))
+def _opcode_regexes() -> dict:
+    """Map each opcode name, wrapped in backticks, to its regex-escaped opcode
+    byte."""
+    out = {
+        b"`" + name.encode() + b"`": re.escape(bytes([opcode]))
+        for (name, opcode) in dis.opmap.items()
+    }
+    # These opcodes are available only in Python >=3.7.
+    # For our purposes, these aliases will do.
+    out.setdefault(b"`LOAD_METHOD`", out[b"`LOAD_ATTR`"])
+    out.setdefault(b"`CALL_METHOD`", out[b"`CALL_FUNCTION`"])
+    return out
+
+
+_OPCODE_REGEXES = _opcode_regexes()
 
 
 def bytecode_regex(pattern: bytes, flags=re.VERBOSE | re.DOTALL):
@@ -56,39 +61,10 @@ def bytecode_regex(pattern: bytes, flags=re.VERBOSE | re.DOTALL):
     assert isinstance(pattern, bytes)
 
     # Replace anything wrapped in backticks with regex-escaped opcodes.
-    pattern = re.sub(
-        rb"`(\w+)`",
-        lambda m: _instruction_to_regex(m[1].decode()),
-        pattern,
-    )
+    pattern = re.sub(rb"`\w+`", lambda m: _OPCODE_REGEXES[m[0]], pattern)
     return re.compile(pattern, flags=flags)
 
 
-# language=PythonVerboseRegExp
-_call_function_bytecode = bytecode_regex(rb"""
-    # Matches `global_function('some', 'constant', 'arguments')`.
-
-    # Load the global function.
-    # In code with >256 of names, this may require extended name references.
-    ((?:`EXTENDED_ARG`.)*
-     (?:`LOAD_NAME`|`LOAD_GLOBAL`|`LOAD_FAST`).)
-
-    # For foo.bar.whizz(), the above is the 'foo', below is the 'bar.whizz'.
-    ((?:(?:`EXTENDED_ARG`.)*
-     (?:`LOAD_METHOD`|`LOAD_ATTR`).)*)
-
-    # Load however many arguments it takes. These (for now) must all be
-    # constants. Again, code with >256 constants may need extended enumeration.
-    ((?:(?:`EXTENDED_ARG`.)*
-     `LOAD_CONST`.)*)
-
-    # Call the function. The parameter is the argument count (which may also be
-    # >256).
-    ((?:`EXTENDED_ARG`.)*
-     (?:`CALL_FUNCTION`|`CALL_METHOD`).)
-
-""")
-
 # language=PythonVerboseRegExp
 _extended_arg_bytecode = bytecode_regex(rb"""(
 
@@ -99,6 +75,7 @@ def bytecode_regex(pattern: bytes, flags=re.VERBOSE | re.DOTALL):
     [^`EXTENDED_ARG`].
 
 )""")
+_extended_arg_findall = _extended_arg_bytecode.findall
 
 
 def extended_arguments(extended_args: bytes):
@@ -112,7 +89,13 @@ def extended_arguments(extended_args: bytes):
     Each ? byte combined together gives the number we want.
 
     """
-    return int.from_bytes(extended_args[1::2], "big")
+    if len(extended_args) == 2:
+        # The usual case of no EXTENDED_ARGs. Skip the slicing and conversion.
+        return extended_args[1]
+    out = 0
+    for i in range(1, len(extended_args), 2):
+        out = (out << 8) | extended_args[i]
+    return out
 
 
 def load(raw: bytes, code: CodeType) -> str:
@@ -142,48 +125,133 @@ def loads(raw: bytes, code: CodeType) -> list:
     ``(foo.bar.pop.whack)``.
 
     """
-    return [load(i, code) for i in _extended_arg_bytecode.findall(raw)]
+    return [load(i, code) for i in _extended_arg_findall(raw)]
+
+
+# Opcode categories used by function_calls() to walk bytecode without regex.
+_OTHER, _ROOT_LOAD, _METHOD_LOAD, _CONST_LOAD, _CALL, _EXTENDED_ARG = range(6)
+
+
+def _opcode_kinds() -> bytes:
+    """Build a 256 byte lookup table mapping each opcode to its category."""
+    kinds = bytearray(256)
+    for (names, kind) in [
+        (("LOAD_NAME", "LOAD_GLOBAL", "LOAD_FAST"), _ROOT_LOAD),
+        (("LOAD_METHOD", "LOAD_ATTR"), _METHOD_LOAD),
+        (("LOAD_CONST",), _CONST_LOAD),
+        (("CALL_FUNCTION", "CALL_METHOD"), _CALL),
+        (("EXTENDED_ARG",), _EXTENDED_ARG),
+    ]:
+        for name in names:
+            # LOAD_METHOD and CALL_METHOD are only available in Python >=3.7.
+            if name in dis.opmap:
+                kinds[dis.opmap[name]] = kind
+    return bytes(kinds)
+
+
+_OPCODE_KINDS = _opcode_kinds()
+
+# The opcodes which terminate a function call.
+_CALL_OPCODES = tuple(dis.opmap[name]
+                      for name in ("CALL_FUNCTION", "CALL_METHOD")
+                      if name in dis.opmap)
 
 
 def function_calls(code: CodeType) -> list:
-    """Scan a code object for all function calls on constant arguments."""
-    match: re.Match
-    out = []
+    """Scan a code object for all function calls on constant arguments.
 
-    for match in _call_function_bytecode.finditer(code.co_code):
-        function_root, methods, args, arg_count = match.groups()
+    The bytecode is walked one instruction at a time looking for::
 
-        # For foo():
-        #   `function_root` contains 'foo' and `methods` is empty.
-        # For foo.bar.whizz():
-        #   `function_root` contains 'foo' and `methods` contains the rest.
-        function_root = load(function_root, code)
-        methods = loads(methods, code)
-        function = ".".join([function_root] + methods)
+        LOAD_NAME/LOAD_GLOBAL/LOAD_FAST  # The 'foo' in foo.bar.whizz().
+        LOAD_METHOD/LOAD_ATTR            # The 'bar.whizz'. Repeated 0+ times.
+        LOAD_CONST                       # The arguments. Repeated 0+ times.
+        CALL_FUNCTION/CALL_METHOD        # The call itself.
 
-        args = loads(args, code)
-        arg_count = extended_arguments(arg_count)
+    where any instruction may be preceded by ``EXTENDED_ARG``\\ s if its
+    parameter is >256.
 
-        if arg_count != len(args):
-            # This happens if there are variable or keyword arguments.
-            # Bail out in either case.
+    """
+    out = []
+    bytecode = code.co_code
+
+    # A cheap pre-filter: if no call opcode byte appears anywhere in the
+    # bytecode then there can't be any function calls.
+    if not any(opcode in bytecode for opcode in _CALL_OPCODES):
+        return out
+
+    opcode_kinds = _OPCODE_KINDS
+    co_names = code.co_names
+    co_consts = code.co_consts
+
+    # The LOAD_xxx opcode and parameter of the function's root name or None if
+    # we're not currently inside a candidate function call.
+    root = None
+    methods = []
+    args = []
+    extended_arg = 0
+
+    # Pair up each opcode with its parameter using C level slicing rather
+    # than indexing into the bytecode twice per instruction.
+    for (opcode, arg) in zip(bytecode[::2], bytecode[1::2]):
+        kind = opcode_kinds[opcode]
+        if kind == _OTHER:
+            # By far the most common case. Any candidate is abandoned.
+            root = None
+            extended_arg = 0
             continue
 
-        out.append((function, args))
+        arg |= extended_arg
+        if kind == _EXTENDED_ARG:
+            # Carry the argument over to the next instruction.
+            extended_arg = arg << 8
+            continue
+        extended_arg = 0
+
+        if kind == _ROOT_LOAD:
+            # Start a new candidate, abandoning any unfinished one.
+            root = (opcode, arg)
+            methods = []
+            args = []
+        elif root is None:
+            continue
+        elif kind == _METHOD_LOAD and not args:
+            methods.append(arg)
+        elif kind == _CONST_LOAD:
+            args.append(arg)
+        else:
+            if kind == _CALL and arg == len(args):
+                # If the argument count doesn't match the number of constants
+                # loaded then there are variable or keyword arguments. Those
+                # are ignored.
+                if root[0] == dis.opmap["LOAD_FAST"]:
+                    function = [code.co_varnames[root[1]]]
+                else:
+                    function = [co_names[root[1]]]
+                function += [co_names[j] for j in methods]
+                out.append((".".join(function), [co_consts[j] for j in args]))
+            root = None
 
     return out
 
 
-def search_recursively(search: callable, code: CodeType, _memo=None) -> dict:
+def search_recursively(search: callable, code: CodeType, _memo=None,
+                       _seen=None) -> dict:
     """Apply a search function to a code object, recursing into child code
     objects (function definitions)."""
     if _memo is None:
         _memo = {}
-    if code not in _memo:
+    if _seen is None:
+        # Track which code objects have been visited by id() rather than by
+        # hash, which digests each code object's bytecode, names and constants.
+        # Every child is kept alive by its parent's co_consts so no id can be
+        # recycled during the search.
+        _seen = set(map(id, _memo))
+    if id(code) not in _seen:
+        _seen.add(id(code))
         _memo[code] = search(code)
         for const in code.co_consts:
             if isinstance(const, CodeType):
-                search_recursively(search, const, _memo)
+                search_recursively(search, const, _memo, _seen)
     return _memo
 
 
@@ -38,9 +38,10 @@
 """
 
 import sys
+import os
 from pathlib import Path
 import json
-import fnmatch
+from collections.abc import Mapping
 
 from PyInstaller import compat
 from PyInstaller.log import logger
@@ -66,6 +67,12 @@
         pass
 
 PYTHONPATH_PREFIXES.sort(key=lambda p: len(p.parts), reverse=True)
+# The same prefixes, normcase()-ed and grouped by the parts count of a file
+# directly inside the prefix, for use in _get_package_name().
+_PYTHONPATH_PREFIXES_BY_PARTS_COUNT = {}
+for _path in PYTHONPATH_PREFIXES:
+    _PYTHONPATH_PREFIXES_BY_PARTS_COUNT.setdefault(
+        len(_path.parts) + 1, []).append(os.path.normcase(str(_path)))
 
 
 class Distribution(object):
@@ -96,12 +103,12 @@ def __init__(self, json_path):
 
         # Everything we need (including this distribution's name) is kept in
         # the metadata json.
-        self.raw = json.loads(self._json_path.read_text())
+        self.raw = json.loads(self._json_path.read_bytes())
 
         # Unpack the more useful contents of the json.
         self.name = self.raw["name"]
         self.version = self.raw["version"]
-        self.files = [PackagePath(i) for i in self.raw["files"]]
+        self._files = None
         self.dependencies = self._init_dependencies()
         self.packages = self._init_package_names()
 
@@ -109,6 +116,18 @@ def __repr__(self):
         return "{}(name=\"{}\", packages={})".format(
             type(self).__name__, self.name, self.packages)
 
+    @property
+    def files(self):
+        """All filenames as :meth:`PackagePath`\\ s included with this
+        distribution.
+
+        These are only built on first access. Most distributions are only read
+        to look at their dependencies or DLLs, neither of which needs them.
+        """
+        if self._files is None:
+            self._files = [PackagePath(i) for i in self.raw["files"]]
+        return self._files
+
     def _init_dependencies(self):
         """
         Read dependencies from ``self.raw["depends"]``.
@@ -130,7 +149,8 @@ def _init_dependencies(self):
 
     def _init_package_names(self):
         """
-        Search ``self.files`` for package names shipped by this distribution.
+        Search ``self.raw["files"]`` for package names shipped by this
+        distribution.
 
         :return: Package names.
         :rtype: list
@@ -139,7 +159,7 @@ def _init_package_names(self):
         install.
         """
         packages = []
-        for file in self.files:
+        for file in self.raw["files"]:
             package = _get_package_name(file)
             if package is not None:
                 packages.append(package)
@@ -152,8 +172,9 @@ def from_name(cls, name):
 
         :rtype: :class:`Distribution`
         """
-        if name in distributions:
-            return distributions[name]
+        distribution = _meta_cache.distribution(name)
+        if distribution is not None:
+            return distribution
         raise ModuleNotFoundError(
             "Distribution {} is either not installed or was not installed "
             "using Conda.".format(name))
@@ -172,6 +193,7 @@ def from_package_name(cls, name):
         Distribution(name="setuptools",
                      packages=['easy_install', 'pkg_resources', 'setuptools'])
         """
+        distributions_by_package = _meta_cache.by_package()
         if name in distributions_by_package:
             return distributions_by_package[name]
         raise ModuleNotFoundError(
@@ -211,17 +233,21 @@ def walk_dependency_tree(initial, excludes=None):
              is the output of ``conda_support.distribution(name)``.
     :rtype: dict
     """
-    if excludes is not None:
-        excludes = set(excludes)
-
     # Rather than use true recursion, mimic it with a to-do queue.
     from collections import deque
     done = {}
     names_to_do = deque([initial])
+    # Every name which should not be added to ``names_to_do``: the excludes
+    # plus every name ever added to it. Checking against this rather than
+    # ``done`` stops shared dependencies from being queued (and, if missing,
+    # warned about) once for each distribution which depends on them.
+    skip = set(excludes) if excludes is not None else set()
+    skip.add(initial)
 
     while names_to_do:
-        # Grab a distribution name from the to-do list.
-        name = names_to_do.pop()
+        # Grab the oldest distribution name from the to-do list so that the
+        # tree is walked breadth first, nearest dependencies first.
+        name = names_to_do.popleft()
         try:
             # Collect and save it's metadata.
             done[name] = distribution = Distribution.from_name(name)
@@ -235,17 +261,12 @@ def walk_dependency_tree(initial, excludes=None):
             continue
         # For each dependency:
         for _name in distribution.dependencies:
-            if _name in done:
-                # Skip anything already done.
-                continue
-            if _name == name:
-                # Avoid infinite recursion if a distribution depends on itself.
-                # This probably will ever happen but I certainly wouldn't
-                # chance it.
-                continue
-            if excludes is not None and _name in excludes:
-                # Don't recurse to excluded dependencies.
+            if _name in skip:
+                # Skip excluded dependencies and anything already done or
+                # waiting to be done. This also avoids infinite recursion if a
+                # distribution depends on itself.
                 continue
+            skip.add(_name)
             names_to_do.append(_name)
     return done
 
@@ -295,6 +316,11 @@ def files(name, dependencies=False, excludes=None):
 else:
     lib_dir = PackagePath("lib")
 
+# Conda always writes filenames in conda-meta jsons with forward slashes.
+_lib_dir_prefix = str(lib_dir) + "/"
+# And the real location of ``lib_dir`` in native path form.
+_lib_dir_location = str(lib_dir.locate())
+
 
 def collect_dynamic_libs(name, dest=".", dependencies=True, excludes=None):
     """
@@ -318,36 +344,71 @@ def collect_dynamic_libs(name, dest=".", dependencies=True, excludes=None):
     :meth:`PyInstaller.utils.hooks.collect_collect_dynamic_libs`.
     """
     _files = []
-    for file in files(name, dependencies, excludes):
+    for dist in _iter_distributions(name, dependencies, excludes):
         # A file is classified as a DLL if it lives inside the dedicated
-        # ``lib_dir`` DLL folder.
-        if file.parent == lib_dir:
-            _files.append((str(file.locate()), dest))
+        # ``lib_dir`` DLL folder. Test the raw filename strings rather than
+        # their :class:`PackagePath` forms as this loop is run for every file
+        # of every distribution.
+        for file in dist.raw["files"]:
+            if file.startswith(_lib_dir_prefix):
+                basename = file[len(_lib_dir_prefix):]
+                if "/" not in basename:
+                    _files.append(
+                        (os.path.join(_lib_dir_location, basename), dest))
     return _files
 
 
 # --- Map packages to distributions and vice-versa ---
 
 
+# For use with ``str.endswith()``, which requires a tuple, and to save looking
+# up ``compat.ALL_SUFFIXES`` for every file in _get_package_name().
+_ALL_SUFFIXES = tuple(compat.ALL_SUFFIXES)
+
+
+def _split_suffix(name):
+    """Split a filename into its :attr:`~pathlib.PurePath.stem` and
+    :attr:`~pathlib.PurePath.suffix` without the overhead of ``pathlib``."""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    return name, ""
+
+
 def _get_package_name(file):
     """Determine the package name of a Python file in ``sys.path``.
 
-    :param file: A Python filename relative to Conda root (sys.prefix).
-    :type file: PackagePath
+    :param file: A Python filename relative to Conda root (sys.prefix), as
+                 written in a conda-meta json (i.e. with ``/`` separators).
+    :type file: str
     :return: Package name or None.
 
     This function only considers single file packages e.g. ``foo.py`` or
     top level ``foo/__init__.py``\\ s. Anything else is ignored (returning
     ``None``).
+
+    This is called for every file of every distribution so it sticks to plain
+    string operations rather than :class:`pathlib.PurePath`\\ s.
     """
-    file = Path(file)
     # TODO: Handle PEP 420 namespace packages (which are missing `__init__`
     #       module). No such Conda PEP 420 namespace packages are known.
 
+    # Most files are DLLs, data or junk. Reject these as cheaply as possible.
+    if not file.endswith(_ALL_SUFFIXES):
+        return
+
+    parent, _, name = file.rpartition("/")
+    stem, suffix = _split_suffix(name)
+
     # Get top-level folders by finding parents of `__init__.xyz`s
-    if file.stem == "__init__" and file.suffix in compat.ALL_SUFFIXES:
-        file = file.parent
-    elif file.suffix not in compat.ALL_SUFFIXES:
+    if stem == "__init__" and suffix in _ALL_SUFFIXES:
+        file = parent
+        if not file:
+            # A top level ``__init__.py`` belongs to no package.
+            return
+        parent, _, name = file.rpartition("/")
+        stem, _ = _split_suffix(name)
+    elif suffix not in _ALL_SUFFIXES:
         # Keep single-file packages but skip DLLs, data and junk files.
         return
 
@@ -355,15 +416,18 @@ def _get_package_name(file):
     # importable. This intentionally excludes submodules which would cause
     # confusion because ``sys.prefix`` is in ``sys.path``, meaning that
     # every file in an Conda installation is a submodule.
-    for prefix in PYTHONPATH_PREFIXES:
-        if len(file.parts) != len(prefix.parts) + 1:
-            # This check is redundant but speeds it up quite a bit.
-            continue
-        # There are no wildcards involved here. The use of ``fnmatch`` is
-        # simply to handle the `if case-insensitive file system: use
-        # case-insensitive string matching.`
-        if fnmatch.fnmatch(str(file.parent), str(prefix)):
-            return file.stem
+    # Only prefixes with the right number of parts can possibly match.
+    prefixes = _PYTHONPATH_PREFIXES_BY_PARTS_COUNT.get(file.count("/") + 1)
+    if not prefixes:
+        return
+    # A file at the top level has parent ``.`` in ``pathlib`` terms.
+    parent = os.path.normcase(parent or ".")
+    for normcased_prefix in prefixes:
+        # Comparing ``normcase()``-ed strings handles the `if case-insensitive
+        # file system: use case-insensitive string matching.` without the
+        # per-call overhead of ``fnmatch``.
+        if parent == normcased_prefix:
+            return stem
 
 
 # All the information we want is organised the wrong way.
@@ -378,24 +442,146 @@ def _get_package_name(file):
 # Conda (non miniconda) with 250+ packages by default at several GiBs. I
 # suppose we could cache this on a per-json basis if it gets too much.
 
+# Looking up a distribution by name, which is all that walk_dependency_tree()
+# and collect_dynamic_libs() need, is an exception. Those noisy filenames are
+# always of the form ``{name}-{version}-{build}.json`` and neither a version
+# nor a build string may contain a ``-``, so a distribution's json can be found
+# without reading any others.
+
 
-def _init_distributions():
-    distributions = {}
-    for path in CONDA_META_DIR.glob("*.json"):
-        dist = Distribution(path)
-        distributions[dist.name] = dist
-    return distributions
+def _list_jsons():
+    """List the ``(filename, full path)`` of every json in ``conda-meta``.
+
+    A single :func:`os.scandir` pass is used rather than ``Path.glob()`` which
+    wraps every entry in a Path.
+    """
+    try:
+        with os.scandir(CONDA_META_DIR) as entries:
+            return [(entry.name, entry.path) for entry in entries
+                    if entry.name.endswith(".json")]
+    except FileNotFoundError:
+        return []
 
 
-distributions = _init_distributions()
+class _MetaCache(object):
+    """The metadata of every distribution, indexed in the ways we want it.
 
+    Everything is read lazily, the first time it is needed, rather than on
+    import as merely importing this module is done by PyInstaller.utils.hooks
+    whenever PyInstaller is run from a Conda environment. Each json is read at
+    most once regardless of how its distribution is looked up.
+    """
+    def __init__(self):
+        self._jsons = None
+        self._paths_by_name = None
+        # Jsons whose filenames can't be indexed by :meth:`paths_by_name` and
+        # which :meth:`distribution` hasn't read yet.
+        self._unindexed_paths = None
+        # Distributions read individually by :meth:`distribution`.
+        self._read = {}
+        self._by_name = None
+        self._by_package = None
+
+    def jsons(self):
+        """The output of :func:`_list_jsons`, listing ``conda-meta`` only once.
+        """
+        if self._jsons is None:
+            self._jsons = _list_jsons()
+        return self._jsons
+
+    def paths_by_name(self):
+        """Map distribution names to their jsons using only the jsons'
+        filenames."""
+        if self._paths_by_name is None:
+            paths_by_name = {}
+            unindexed_paths = []
+            for (filename, path) in self.jsons():
+                parts = filename[:-len(".json")].rsplit("-", 2)
+                if len(parts) == 3:
+                    paths_by_name[parts[0]] = path
+                else:
+                    unindexed_paths.append(path)
+            self._paths_by_name = paths_by_name
+            self._unindexed_paths = unindexed_paths
+        return self._paths_by_name
+
+    def distribution(self, name):
+        """Get a single distribution by name (or None if it doesn't exist),
+        reading only its own json if everything hasn't been read already."""
+        if self._by_name is not None:
+            return self._by_name.get(name)
+        dist = self._read.get(name)
+        if dist is None:
+            path = self.paths_by_name().get(name)
+            if path is None:
+                # Either there is no such distribution, which is common for
+                # virtual packages such as ``__glibc`` or dependencies
+                # installed with pip, or it is one of the (normally no) jsons
+                # whose filenames aren't of the expected form. Read only the
+                # latter.
+                for path in self._unindexed_paths:
+                    dist = Distribution(path)
+                    self._read.setdefault(dist.name, dist)
+                self._unindexed_paths = []
+                return self._read.get(name)
+            dist = Distribution(path)
+            if dist.name != name:
+                # The json's filename is not as expected. Fall back to reading
+                # everything.
+                return self.by_name().get(name)
+            self._read[name] = dist
+        return dist
+
+    def by_name(self):
+        """Get a ``{name: distribution}`` mapping of all distributions."""
+        if self._by_name is None:
+            # Reuse anything already read by distribution() so that nothing is
+            # parsed twice and the same Distribution objects are always
+            # returned.
+            already_read = {
+                str(dist._json_path): dist for dist in self._read.values()
+            }
+            by_name = {}
+            for (_, path) in self.jsons():
+                dist = already_read.get(path) or Distribution(path)
+                by_name[dist.name] = dist
+            self._by_name = by_name
+        return self._by_name
+
+    def by_package(self):
+        """Get a ``{package name: distribution}`` mapping of all packages."""
+        if self._by_package is None:
+            by_package = {}
+            for distribution in self.by_name().values():
+                for package in distribution.packages:
+                    by_package[package] = distribution
+            self._by_package = by_package
+        return self._by_package
+
+
+_meta_cache = _MetaCache()
+
+
+class _LazyMapping(Mapping):
+    """A read-only view of the dict returned by **build**, which is only
+    called once the view is actually used."""
+    def __init__(self, build):
+        self._build = build
+
+    def __getitem__(self, key):
+        return self._build()[key]
+
+    def __iter__(self):
+        return iter(self._build())
+
+    def __len__(self):
+        return len(self._build())
 
-def _init_packages():
-    distributions_by_package = {}
-    for distribution in distributions.values():
-        for package in distribution.packages:
-            distributions_by_package[package] = distribution
-    return distributions_by_package
+    def __repr__(self):
+        return repr(self._build())
 
 
-distributions_by_package = _init_packages()
+# ``{name: distribution}`` and ``{package name: distribution}`` mappings of
+# all distributions.
+distributions = _LazyMapping(lambda: _meta_cache.by_name())
+distributions_by_package = _LazyMapping(lambda: _meta_cache.by_package())
@@ -0,0 +1,196 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2005-2021, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+
+
+import os
+import json
+from pathlib import PurePosixPath
+
+import pytest
+
+from PyInstaller import compat
+from PyInstaller.utils.hooks import conda
+
+SITE_PACKAGES = "lib/python3.9/site-packages"
+LIB_DIR = str(conda.lib_dir)
+
+# conda-meta json filenames and their contents. ``a`` depends on ``b`` and
+# ``c`` which both depend on ``d`` (a diamond). ``a`` also depends on itself
+# and ``c`` and ``d`` on things which aren't installed.
+FAKE_CONDA_META = {
+    "a-1.0-py_0.json": {
+        "name": "a",
+        "depends": ["b >=1.0", "c", "a"],
+        "files": [LIB_DIR + "/liba.so", LIB_DIR + "/sub/not_a_lib.so",
+                  SITE_PACKAGES + "/a/__init__.py",
+                  SITE_PACKAGES + "/a/submodule.py"],
+    },
+    "b-1.0-py_0.json": {
+        "name": "b",
+        "depends": ["d"],
+        "files": [LIB_DIR + "/libb.so", SITE_PACKAGES + "/b.py"],
+    },
+    "c-2.0-h1234_5.json": {
+        "name": "c",
+        "depends": ["d 1.*", "missing"],
+        "files": [LIB_DIR + "/libc.so"],
+    },
+    "d-1-0.json": {
+        "name": "d",
+        # A virtual package, which never has a json.
+        "depends": ["__glibc >=2.17"],
+        "files": [LIB_DIR + "/libd.so", "bin/d"],
+    },
+    # A json whose filename doesn't follow the usual
+    # ``{name}-{version}-{build}.json`` form.
+    "weird_filename.json": {
+        "name": "oddname",
+        "depends": [],
+        "files": [SITE_PACKAGES + "/oddpackage.py"],
+    },
+    # A json whose filename looks normal but names a different distribution.
+    "e-1.0-py_0.json": {
+        "name": "f",
+        "depends": [],
+        "files": [],
+    },
+}
+
+
+@pytest.fixture
+def pythonpath_prefixes(monkeypatch):
+    """Pretend that both ``sys.prefix`` and its ``site-packages`` are in
+    ``sys.path``."""
+    monkeypatch.setattr(conda, "_PYTHONPATH_PREFIXES_BY_PARTS_COUNT", {
+        1: [os.path.normcase(".")],
+        4: [os.path.normcase(os.path.join(*SITE_PACKAGES.split("/")))],
+    })
+
+
+@pytest.fixture
+def fake_conda_meta(tmp_path, monkeypatch, pythonpath_prefixes):
+    """Point the conda module at a ``conda-meta`` folder containing
+    FAKE_CONDA_META with nothing read yet."""
+    conda_meta = tmp_path / "conda-meta"
+    conda_meta.mkdir()
+    for (filename, meta) in FAKE_CONDA_META.items():
+        meta = dict(meta, version="1.0", build="py_0")
+        (conda_meta / filename).write_text(json.dumps(meta))
+    monkeypatch.setattr(conda, "CONDA_META_DIR", conda_meta)
+    monkeypatch.setattr(conda, "_meta_cache", conda._MetaCache())
+
+
+@pytest.mark.parametrize("full_read_first", [False, True])
+def test_distribution(fake_conda_meta, full_read_first):
+    if full_read_first:
+        assert conda.package_distribution("b").name == "b"
+
+    a = conda.distribution("a")
+    assert a.name == "a"
+    assert a.dependencies == ["b", "c", "a"]
+    assert a.packages == ["a"]
+    # Unused keys must still be available.
+    assert a.raw["build"] == "py_0"
+    assert a.files == [conda.PackagePath(i)
+                       for i in FAKE_CONDA_META["a-1.0-py_0.json"]["files"]]
+    assert conda.files("a") == a.files
+    assert conda.distribution("oddname").packages == ["oddpackage"]
+    with pytest.raises(ModuleNotFoundError):
+        conda.distribution("missing")
+
+    # Reading everything must reuse anything already read.
+    assert conda.package_distribution("a") is a
+    assert conda.distributions["a"] is a
+    assert conda.distributions_by_package["oddpackage"].name == "oddname"
+    assert set(conda.distributions) == {"a", "b", "c", "d", "oddname", "f"}
+    assert conda.distribution("a") is a
+    with pytest.raises(ModuleNotFoundError):
+        conda.package_distribution("missing")
+
+
+def test_distribution_lookup_is_lazy(fake_conda_meta):
+    conda.distribution("a")
+    # Only a's own json should have been read.
+    assert conda._meta_cache._by_name is None
+    assert list(conda._meta_cache._read) == ["a"]
+    # And its PackagePaths aren't built until asked for.
+    conda.collect_dynamic_libs("a", dependencies=False)
+    assert conda._meta_cache._read["a"]._files is None
+
+
+def test_distribution_filename_mismatch(fake_conda_meta):
+    # Finding that e's json actually belongs to ``f`` requires reading
+    # everything. After that, ``f`` is found too.
+    with pytest.raises(ModuleNotFoundError):
+        conda.distribution("e")
+    assert conda.distribution("f").name == "f"
+
+
+def test_walk_dependency_tree(fake_conda_meta):
+    # Breadth first. The diamond dependency ``d`` appears only once and the
+    # missing dependency is skipped.
+    assert list(conda.walk_dependency_tree("a")) == ["a", "b", "c", "d"]
+    assert list(conda.walk_dependency_tree("a", ["c"])) == ["a", "b", "d"]
+    assert list(conda.walk_dependency_tree("a", ["b", "c"])) == ["a"]
+    assert list(conda.walk_dependency_tree("d")) == ["d"]
+
+    # Missing dependencies mustn't trigger reading every json. Only those
+    # walked and the one json which can't be indexed by its filename should be
+    # read.
+    assert conda._meta_cache._by_name is None
+    assert set(conda._meta_cache._read) == {"a", "b", "c", "d", "oddname"}
+
+
+def test_collect_dynamic_libs(fake_conda_meta):
+    def lib(name):
+        return (str(conda.lib_dir.locate() / name), ".")
+
+    assert conda.collect_dynamic_libs("a", dependencies=False) == \
+        [lib("liba.so")]
+    assert sorted(conda.collect_dynamic_libs("a")) == \
+        sorted([lib("liba.so"), lib("libb.so"), lib("libc.so"),
+                lib("libd.so")])
+    assert sorted(conda.collect_dynamic_libs("a", "dest", excludes=["b"])) \
+        == sorted([(path, "dest") for (path, _) in
+                   [lib("liba.so"), lib("libc.so"), lib("libd.so")]])
+
+
+@pytest.mark.parametrize("name", [
+    "foo.py", "foo", ".bashrc", "foo.", "foo.tar.gz", ".foo.py", "a.b.c",
+])
+def test_split_suffix(name):
+    path = PurePosixPath(name)
+    assert conda._split_suffix(name) == (path.stem, path.suffix)
+
+
+@pytest.mark.parametrize("file, package", [
+    ("foo.py", "foo"),
+    ("foo/__init__.py", "foo"),
+    # A top level ``__init__.py`` has no parent folder to name a package after.
+    ("__init__.py", None),
+    (SITE_PACKAGES + "/foo.py", "foo"),
+    (SITE_PACKAGES + "/foo/__init__.py", "foo"),
+    (SITE_PACKAGES + "/_foo" + compat.EXTENSION_SUFFIXES[-1], "_foo"),
+    # Submodules.
+    (SITE_PACKAGES + "/foo/bar.py", None),
+    (SITE_PACKAGES + "/foo/bar/__init__.py", None),
+    # Not in sys.path.
+    ("bin/foo.py", None),
+    (SITE_PACKAGES.rsplit("/", 1)[0] + "/foo.py", None),
+    # Not Python files.
+    (SITE_PACKAGES + "/foo.txt", None),
+    (SITE_PACKAGES + "/foo/__init__.txt", None),
+    # Dotfiles have no suffix in pathlib terms.
+    (SITE_PACKAGES + "/.py", None),
+    (SITE_PACKAGES + "/.foo.py", ".foo"),
+])
+def test_get_package_name(pythonpath_prefixes, file, package):
+    assert conda._get_package_name(file) == package
@@ -75,6 +75,55 @@ def test_metadata_collection(tmpdir):
     assert copy_metadata("altgraph")[0] in metadata
 
 
+def test_metadata_searches_only_code_naming_methods(monkeypatch):
+    """_metadata_from() skips scanning code objects which don't mention any
+    of the methods but must still find every call which does."""
+    from PyInstaller.depend import bytecode
+    from PyInstaller.utils import hooks
+
+    code = compile(dedent("""
+        import foo
+        from foo import get_thing
+
+        foo.get_thing("attribute")
+        get_thing("global")
+
+        def local(get_thing):
+            get_thing("local")
+
+        def unrelated():
+            something_else("unrelated")
+    """), "<no file>", "exec")
+
+    scanned = []
+    function_calls = bytecode.function_calls
+
+    def recording_function_calls(code):
+        scanned.append(code.co_name)
+        return function_calls(code)
+
+    monkeypatch.setattr(bytecode, "function_calls", recording_function_calls)
+    monkeypatch.setattr(hooks, "copy_metadata",
+                        lambda name, recursive=False: [(name, name)])
+
+    graph = types.SimpleNamespace(get_code_using=lambda package: {
+        "module": code})
+    metadata = analysis.PyiModuleGraph._metadata_from(graph, "foo",
+                                                      ["get_thing"])
+
+    assert metadata == {("attribute", "attribute"), ("global", "global"),
+                        ("local", "local")}
+    assert sorted(scanned) == ["<module>", "local"]
+
+    # A shared cache means that each code object is scanned only once.
+    scanned.clear()
+    cache = {}
+    for _ in range(2):
+        analysis.PyiModuleGraph._metadata_from(
+            graph, "foo", ["get_thing"], _function_calls_cache=cache)
+    assert sorted(scanned) == ["<module>", "local"]
+
+
 class FakePyiModuleGraph(analysis.PyiModuleGraph):
     def _analyze_base_modules(self):
         # suppress this to speed up set-up